@@ -1,74 +1,92 @@
-from http.server import HTTPServer, BaseHTTPRequestHandler
-import requests
-import json
-import urllib.parse
+import aiohttp
+from aiohttp import web
 
-class CORSHandler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-    
-    def do_POST(self):
-        if self.path in ['/predict', '/health']:
-            try:
-                content_length = int(self.headers.get('Content-Length', 0))
-                post_data = self.rfile.read(content_length)
-                
-                # Forward to actual API
-                response = requests.post(
-                    f"http://localhost:8000{self.path}",
-                    data=post_data,
-                    headers={'Content-Type': 'application/json'},
-                    timeout=10
-                )
-                
-                # Send proper HTTP response
-                self.send_response(response.status_code)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
-                # Send response body
-                self.wfile.write(response.content)
-                
-            except Exception as e:
-                print(f"POST Error: {e}")
-                self.send_error(500, f"Internal error: {e}")
-        else:
-            self.send_error(404, "Not found")
-    
-    def do_GET(self):
-        if self.path == '/health':
-            try:
-                response = requests.get("http://localhost:8000/health", timeout=10)
-                
-                # Send proper HTTP response
-                self.send_response(response.status_code)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
-                # Send response body
-                self.wfile.write(response.content)
-                
-            except Exception as e:
-                print(f"GET Error: {e}")
-                self.send_error(500, f"Internal error: {e}")
+BACKEND_URL = "http://localhost:8000"
+
+# listen() backlog for bursts of new client connections (aiohttp default: 128)
+LISTEN_BACKLOG = 2048
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
+
+@web.middleware
+async def cors_middleware(request, handler):
+    """Answer preflight requests and add CORS headers to every response"""
+    if request.method == 'OPTIONS':
+        response = web.Response(status=200)
+    else:
+        try:
+            response = await handler(request)
+        except web.HTTPException as e:
+            response = web.Response(status=e.status, reason=e.reason, text=e.text)
+    if not response.prepared:
+        response.headers.update(CORS_HEADERS)
+    return response
+
+async def forward(request):
+    """Forward the request to the actual API on the shared client session"""
+    proxied = None
+    try:
+        client = request.app['client']
+        if request.method == 'POST':
+            # Stream the client body upstream instead of buffering it first
+            headers = {'Content-Type': 'application/json'}
+            if request.content_length is not None:
+                headers['Content-Length'] = str(request.content_length)
+            backend = client.post(
+                f"{BACKEND_URL}{request.path}",
+                data=request.content.iter_chunked(16384),
+                headers=headers
+            )
         else:
-            self.send_error(404, "Not found")
+            backend = client.get(f"{BACKEND_URL}{request.path}")
+
+        async with backend as response:
+            # Stream the body through as it arrives instead of buffering it
+            proxied = web.StreamResponse(status=response.status)
+            proxied.content_type = 'application/json'
+            if response.content_length is not None:
+                proxied.content_length = response.content_length
+            proxied.headers.update(CORS_HEADERS)
+            await proxied.prepare(request)
+
+            async for chunk in response.content.iter_chunked(16384):
+                await proxied.write(chunk)
+            await proxied.write_eof()
+            return proxied
+
+    except Exception as e:
+        print(f"{request.method} Error: {e}")
+        if proxied is not None and proxied.prepared:
+            # Headers are already on the wire; just drop the connection
+            raise
+        raise web.HTTPInternalServerError(text=f"Internal error: {e}")
+
+async def start_client(app):
+    app['client'] = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=200, keepalive_timeout=60),
+        timeout=aiohttp.ClientTimeout(total=10, sock_connect=1.0)
+    )
+
+async def close_client(app):
+    await app['client'].close()
+
+def create_app():
+    app = web.Application(middlewares=[cors_middleware])
+    app.router.add_post('/predict', forward)
+    app.router.add_post('/health', forward)
+    app.router.add_get('/health', forward)
+    app.on_startup.append(start_client)
+    app.on_cleanup.append(close_client)
+    return app
 
 if __name__ == '__main__':
     try:
-        server = HTTPServer(('0.0.0.0', 8001), CORSHandler)
         print("🌍 Fixed CORS proxy running on port 8001")
         print("📡 Forwarding requests to http://localhost:8000")
-        server.serve_forever()
+        web.run_app(create_app(), host='0.0.0.0', port=8001, backlog=LISTEN_BACKLOG, print=None)
     except Exception as e:
         print(f"❌ Failed to start CORS proxy: {e}")
@@ -3,21 +3,80 @@
 🤖 Customer Support AI Agent - Interactive Demo
 """
 
+import argparse
+import asyncio
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import orjson
+    loads_json = orjson.loads
+except ImportError:
+    loads_json = json.loads
+
+# (connect, read) timeouts: fail fast on a dead agent, allow slow predictions
+HEALTH_TIMEOUT = (0.5, 5.0)
+PREDICT_TIMEOUT = (1.0, 10.0)
+
+# Shared keep-alive connection pool for all calls to the AI agent; only
+# connection failures are retried, since a request was never sent for those
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, connect=2, read=0, redirect=0, status=0, backoff_factor=0.1)
+))
+
+DEMO_SCENARIOS = [
+    {
+        "message": "I can't log into my account and I'm getting frustrated!",
+        "issue_type": "account_access",
+        "description": "Frustrated customer with login issues"
+    },
+    {
+        "message": "Your team helped me so quickly! Amazing service!",
+        "issue_type": "compliment", 
+        "description": "Happy customer giving praise"
+    },
+    {
+        "message": "My order is late and no one is responding to my emails",
+        "issue_type": "shipping",
+        "description": "Upset customer with shipping delays"
+    },
+    {
+        "message": "I need help setting up my new product",
+        "issue_type": "technical_support",
+        "description": "Customer needing technical assistance"
+    },
+    {
+        "message": "I want to cancel my subscription immediately",
+        "issue_type": "billing",
+        "description": "Customer wanting to cancel service"
+    },
+    {
+        "message": "Thank you for the quick refund process!",
+        "issue_type": "billing",
+        "description": "Satisfied customer after resolution"
+    }
+]
+
 class CustomerSupportDemo:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.predict_url = f"{base_url}/predict"
         self.health_url = f"{base_url}/health"
+        self.session = SESSION
     
     def check_health(self):
         """Check if the AI agent is running"""
         try:
-            response = requests.get(self.health_url, timeout=5)
+            response = self.session.get(self.health_url, timeout=HEALTH_TIMEOUT)
             if response.status_code == 200:
                 print("✅ AI Agent is healthy and running!")
                 return True
@@ -30,23 +89,35 @@ class CustomerSupportDemo:
     
     def predict(self, message, issue_type="general"):
         """Make a prediction"""
+        return self.show_prediction(message, issue_type, *self.request_prediction(message, issue_type))
+    
+    def request_prediction(self, message, issue_type="general"):
+        """Send a prediction request and time the round trip"""
         payload = {
             "message": message,
             "issue_type": issue_type
         }
         
+        start_time = time.time()
         try:
-            print(f"\n🔍 Processing: '{message}'")
-            print(f"📋 Issue Type: {issue_type}")
-            
-            start_time = time.time()
-            response = requests.post(self.predict_url, json=payload, timeout=10)
-            end_time = time.time()
+            response = self.session.post(self.predict_url, json=payload, timeout=PREDICT_TIMEOUT)
+            return response, None, time.time() - start_time
+        except Exception as e:
+            return None, e, time.time() - start_time
+    
+    def show_prediction(self, message, issue_type, response, error, elapsed):
+        """Print the outcome of a prediction request"""
+        print(f"\n🔍 Processing: '{message}'")
+        print(f"📋 Issue Type: {issue_type}")
+        
+        try:
+            if error is not None:
+                raise error
             
             if response.status_code == 200:
-                result = response.json()
+                result = loads_json(response.content)
                 
-                print(f"⚡ Response Time: {(end_time - start_time)*1000:.1f}ms")
+                print(f"⚡ Response Time: {elapsed*1000:.1f}ms")
                 print(f"😊 Predicted Satisfaction: {result['predicted_satisfaction']}")
                 print(f"🎯 Confidence: {result['confidence']:.1%}")
                 print(f"⚡ Recommended Priority: {result['recommended_priority']}")
@@ -71,51 +142,25 @@ class CustomerSupportDemo:
             print("Please start the AI agent first with: make deploy")
             return
         
-        scenarios = [
-            {
-                "message": "I can't log into my account and I'm getting frustrated!",
-                "issue_type": "account_access",
-                "description": "Frustrated customer with login issues"
-            },
-            {
-                "message": "Your team helped me so quickly! Amazing service!",
-                "issue_type": "compliment", 
-                "description": "Happy customer giving praise"
-            },
-            {
-                "message": "My order is late and no one is responding to my emails",
-                "issue_type": "shipping",
-                "description": "Upset customer with shipping delays"
-            },
-            {
-                "message": "I need help setting up my new product",
-                "issue_type": "technical_support",
-                "description": "Customer needing technical assistance"
-            },
-            {
-                "message": "I want to cancel my subscription immediately",
-                "issue_type": "billing",
-                "description": "Customer wanting to cancel service"
-            },
-            {
-                "message": "Thank you for the quick refund process!",
-                "issue_type": "billing",
-                "description": "Satisfied customer after resolution"
-            }
-        ]
+        scenarios = DEMO_SCENARIOS
         
         print(f"\n🎯 Running {len(scenarios)} demo scenarios...\n")
         
+        # Scenarios are independent, so send them all at once
+        with ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+            responses = list(executor.map(
+                lambda scenario: self.request_prediction(scenario["message"], scenario["issue_type"]),
+                scenarios
+            ))
+        
         results = []
-        for i, scenario in enumerate(scenarios, 1):
+        for i, (scenario, response) in enumerate(zip(scenarios, responses), 1):
             print(f"\n📋 Scenario {i}: {scenario['description']}")
             print("-" * 40)
             
-            result = self.predict(scenario["message"], scenario["issue_type"])
+            result = self.show_prediction(scenario["message"], scenario["issue_type"], *response)
             if result:
                 results.append({**scenario, "result": result})
-            
-            time.sleep(1)  # Brief pause between demos
         
         # Summary
         print(f"\n📊 Demo Summary")
@@ -131,6 +176,45 @@ class CustomerSupportDemo:
         
         return results
     
+    async def stress(self, n):
+        """Fire n scenario requests concurrently and report throughput"""
+        print(f"🔥 Stress test: {n} concurrent requests to {self.predict_url}")
+        
+        latencies = []
+        
+        async def send(session, scenario):
+            payload = {"message": scenario["message"], "issue_type": scenario["issue_type"]}
+            start_time = time.perf_counter()
+            async with session.post(self.predict_url, json=payload) as response:
+                await response.read()
+                latencies.append(time.perf_counter() - start_time)
+                return response.status == 200
+        
+        connector = aiohttp.TCPConnector(limit=n)
+        timeout = aiohttp.ClientTimeout(total=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            start_time = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(send(session, DEMO_SCENARIOS[i % len(DEMO_SCENARIOS)]) for i in range(n)),
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - start_time
+        
+        succeeded = sum(1 for outcome in outcomes if outcome is True)
+        latencies.sort()
+        
+        print(f"\n📊 Stress Test Summary")
+        print("=" * 50)
+        print(f"✅ Succeeded: {succeeded}/{n}")
+        print(f"⏱️  Wall time: {elapsed:.2f}s")
+        print(f"🚀 Throughput: {n / elapsed:.1f} requests/sec")
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"⚡ Latency p50: {p50*1000:.1f}ms | p99: {p99*1000:.1f}ms")
+        
+        return succeeded
+    
     def interactive_mode(self):
         """Interactive demo mode"""
         print("\n🎮 Interactive Mode - Try your own messages!")
@@ -157,12 +241,28 @@ class CustomerSupportDemo:
         
         print("👋 Thanks for trying the demo!")
 
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    n = int(value)
+    if n <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return n
+
 def main():
+    parser = argparse.ArgumentParser(description="Customer Support AI Agent demo")
+    parser.add_argument("--stress", type=positive_int, metavar="N",
+                        help="send N concurrent scenario requests and report throughput")
+    args = parser.parse_args()
+    
     print("🤖 Customer Support AI Agent - Demo")
     print("=" * 50)
     
     demo = CustomerSupportDemo()
     
+    if args.stress is not None:
+        asyncio.run(demo.stress(args.stress))
+        return
+    
     print("\nDemo Options:")
     print("1. Run automated demo scenarios")
     print("2. Interactive mode (try your own messages)")
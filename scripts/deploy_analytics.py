@@ -6,24 +6,125 @@ Tracks metrics and generates insights
 
 import os
 import json
+import queue
 import sqlite3
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
 from typing import Dict, Any
 from pathlib import Path
 
+try:
+    import orjson
+    
+    def dumps_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    def dumps_pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
+
+INSERT_SQL = '''
+    INSERT INTO interactions 
+    (customer_id, customer_tier, issue_type, sentiment, 
+     predicted_satisfaction, priority, confidence, message_length,
+     email_sent, response_time_ms)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SUMMARY_SQL = '''
+    SELECT 
+        issue_type,
+        COUNT(*) as count,
+        COUNT(CASE WHEN priority = 'high' THEN 1 END) as high_priority,
+        COUNT(CASE WHEN sentiment = 'negative' THEN 1 END) as negative_sentiment,
+        COUNT(CASE WHEN email_sent = 1 THEN 1 END) as emails_sent,
+        SUM(confidence) as confidence_sum,
+        COUNT(confidence) as confidence_count
+    FROM interactions 
+    WHERE timestamp >= datetime('now', ?)
+    GROUP BY issue_type
+'''
+
+# Writer thread batching: at most this many rows, or this long, per commit
+WRITE_BATCH_SIZE = 200
+WRITE_BATCH_WAIT = 0.1
+
+def _write_rows(write_queue, conn, lock):
+    """Drain queued rows into the database in batched transactions until a None arrives"""
+    stopping = False
+    while not stopping:
+        batch = [write_queue.get()]
+        deadline = time.monotonic() + WRITE_BATCH_WAIT
+        while len(batch) < WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        
+        rows = [row for row in batch if row is not None]
+        stopping = len(rows) < len(batch)
+        try:
+            if rows:
+                with lock:
+                    conn.execute('BEGIN')
+                    try:
+                        conn.executemany(INSERT_SQL, rows)
+                        conn.execute('COMMIT')
+                    except Exception:
+                        conn.execute('ROLLBACK')
+                        raise
+        except Exception as e:
+            print(f"❌ Analytics batch write failed ({len(rows)} rows): {e}")
+        finally:
+            for _ in batch:
+                write_queue.task_done()
+
+def _shutdown(write_queue, writer, conn):
+    """Write out queued rows, stop the writer thread and close the connection"""
+    write_queue.put(None)
+    writer.join()
+    conn.close()
+
 class AnalyticsAction:
+    # Set once the tables and indexes exist, so later instances skip the DDL
+    _schema_ready = False
+    
     def __init__(self):
         self.name = "AnalyticsAction"
         self.enabled = True
         self.db_path = "/workspace/data/analytics.db"
+        self.lock = threading.Lock()
         self.setup_database()
+        
+        # Rows are written off the request path by a single writer thread. It
+        # holds no reference to self, so the finalizer can stop it when this
+        # instance is closed, collected, or the interpreter exits
+        self.write_queue = queue.Queue(maxsize=10000)
+        writer = threading.Thread(target=_write_rows, args=(self.write_queue, self.conn, self.lock),
+                                  name="analytics-writer", daemon=True)
+        writer.start()
+        self._finalizer = weakref.finalize(self, _shutdown, self.write_queue, writer, self.conn)
     
     def setup_database(self):
         """Initialize SQLite database for analytics"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        # One long-lived autocommit connection; statements stay cached on it
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        
+        if AnalyticsAction._schema_ready:
+            return
+        
+        with self.lock:
+            # WAL mode is stored in the database file, so it is set once with the schema
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            cursor = self.conn.cursor()
             
             # Create interactions table
             cursor.execute('''
@@ -43,7 +144,17 @@ class AnalyticsAction:
                 )
             ''')
             
-            conn.commit()
+            # Indexes for the time-windowed summary queries
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_interactions_ts
+                ON interactions(timestamp)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_interactions_ts_issue
+                ON interactions(timestamp, issue_type)
+            ''')
+        
+        AnalyticsAction._schema_ready = True
     
     def should_execute(self, prediction: Dict[str, Any], context: Dict[str, Any]) -> bool:
         """Analytics should always execute to track all interactions"""
@@ -71,77 +182,65 @@ class AnalyticsAction:
             message_length = len(message)
             response_time_ms = context.get("response_time_ms", 0)
             
-            # Store in database
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO interactions 
-                    (customer_id, customer_tier, issue_type, sentiment, 
-                     predicted_satisfaction, priority, confidence, message_length,
-                     email_sent, response_time_ms)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    customer_id, customer_tier, issue_type, sentiment,
-                    predicted_satisfaction, priority, confidence, message_length,
-                    email_sent, response_time_ms
-                ))
-                conn.commit()
-                interaction_id = cursor.lastrowid
+            # Hand the row to the background writer
+            self.write_queue.put_nowait((
+                customer_id, customer_tier, issue_type, sentiment,
+                predicted_satisfaction, priority, confidence, message_length,
+                email_sent, response_time_ms
+            ))
             
             return {
                 "tracked": True,
-                "interaction_id": interaction_id,
-                "timestamp": datetime.now().isoformat()
+                "queued": True,
+                # Row timestamp comes from the CURRENT_TIMESTAMP column default
+                "timestamp": time.time()
             }
             
+        except queue.Full:
+            return {
+                "tracked": False,
+                "error": "analytics write queue is full"
+            }
         except Exception as e:
             return {
                 "tracked": False,
                 "error": str(e)
             }
     
+    def flush(self):
+        """Block until every queued row has been written"""
+        self.write_queue.join()
+    
+    def close(self):
+        """Write out queued rows, then stop the writer thread and close the connection"""
+        self._finalizer()
+    
     def get_summary(self, days: int = 7) -> Dict[str, Any]:
         """Get analytics summary"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Get metrics for last N days
-                cursor.execute('''
-                    SELECT 
-                        COUNT(*) as total_interactions,
-                        COUNT(CASE WHEN priority = 'high' THEN 1 END) as high_priority,
-                        COUNT(CASE WHEN sentiment = 'negative' THEN 1 END) as negative_sentiment,
-                        COUNT(CASE WHEN email_sent = 1 THEN 1 END) as emails_sent,
-                        AVG(confidence) as avg_confidence
-                    FROM interactions 
-                    WHERE timestamp >= datetime('now', '-{} days')
-                '''.format(days))
-                
-                metrics = cursor.fetchone()
-                
-                # Get issue type distribution
-                cursor.execute('''
-                    SELECT issue_type, COUNT(*) as count
-                    FROM interactions 
-                    WHERE timestamp >= datetime('now', '-{} days')
-                    GROUP BY issue_type
-                    ORDER BY count DESC
-                '''.format(days))
-                
-                issue_distribution = cursor.fetchall()
-                
-                return {
-                    "period_days": days,
-                    "total_interactions": metrics[0] if metrics else 0,
-                    "high_priority_count": metrics[1] if metrics else 0,
-                    "negative_sentiment_count": metrics[2] if metrics else 0,
-                    "emails_sent": metrics[3] if metrics else 0,
-                    "avg_confidence": round(metrics[4] or 0, 3) if metrics else 0,
-                    "issue_distribution": dict(issue_distribution),
-                    "generated_at": datetime.now().isoformat()
-                }
-                
+            self.flush()
+            
+            with self.lock:
+                # Per-issue-type metrics for last N days in a single indexed scan
+                rows = self.conn.execute(SUMMARY_SQL, (f'-{int(days)} days',)).fetchall()
+            
+            total = sum(row[1] for row in rows)
+            confidence_count = sum(row[6] for row in rows)
+            confidence_sum = sum(row[5] or 0 for row in rows)
+            issue_distribution = sorted(((row[0], row[1]) for row in rows),
+                                        key=lambda item: item[1], reverse=True)
+            
+            return {
+                "period_days": days,
+                "total_interactions": total,
+                "high_priority_count": sum(row[2] for row in rows),
+                "negative_sentiment_count": sum(row[3] for row in rows),
+                "emails_sent": sum(row[4] for row in rows),
+                "avg_confidence": round(confidence_sum / confidence_count, 3) if confidence_count else 0,
+                "issue_distribution": dict(issue_distribution),
+                "generated_at": datetime.now().isoformat()
+            }
+            
         except Exception as e:
             return {"error": str(e)}
 
@@ -169,11 +268,11 @@ def test_analytics():
     }
     
     result = analytics.execute(test_prediction, test_context)
-    print("Analytics Result:", json.dumps(result, indent=2))
+    print("Analytics Result:", dumps_pretty(result))
     
     # Get summary
     summary = analytics.get_summary()
-    print("Summary:", json.dumps(summary, indent=2))
+    print("Summary:", dumps_pretty(summary))
 
 if __name__ == "__main__":
     test_analytics()
@@ -5,58 +5,118 @@ Enhanced version with better .env.real loading
 """
 
 import os
+import functools
+import html
+import re
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from datetime import datetime
 from typing import Dict, Any
 from pathlib import Path
 
+PREMIUM_TIERS = frozenset({"vip", "premium", "enterprise"})
+
+# Substring matches, same as the previous chain of `in` checks
+TRIGGER_KEYWORDS_RE = re.compile(r"urgent|critical|emergency|angry|frustrated|terrible|awful")
+BILLING_CHARGE_RE = re.compile(r"billing.*charge|charge.*billing", re.DOTALL)
+
+PRIORITY_COLORS = {'high': 'red', 'medium': 'orange'}
+
+BODY_HTML = """
+        <html>
+        <body>
+        <h2>🤖 AI Customer Support Alert</h2>
+        
+        <table border="1" cellpadding="10" cellspacing="0" style="border-collapse: collapse;">
+        <tr><td><strong>Customer ID:</strong></td><td>$customer_id</td></tr>
+        <tr><td><strong>Customer Message:</strong></td><td>$customer_message</td></tr>
+        <tr><td><strong>Issue Type:</strong></td><td>$issue_title</td></tr>
+        <tr><td><strong>Priority:</strong></td><td><span style="color: $priority_color;">$priority_upper</span></td></tr>
+        <tr><td><strong>Sentiment:</strong></td><td>$sentiment_title</td></tr>
+        <tr><td><strong>AI Confidence:</strong></td><td>$confidence_pct</td></tr>
+        <tr><td><strong>Timestamp:</strong></td><td>$timestamp</td></tr>
+        </table>
+        
+        <p><strong>📋 Alert Summary:</strong></p>
+        <ul>
+        <li>A $priority priority $issue_type issue has been detected</li>
+        <li>Customer sentiment appears $sentiment</li>
+        <li>AI prediction confidence: $confidence_pct</li>
+        </ul>
+        
+        <p><em>This is an automated alert from the AI Customer Support System.<br>
+        Please follow up with the customer promptly.</em></p>
+        
+        <hr>
+        <small>Generated at $timestamp</small>
+        </body>
+        </html>
+        """.strip()
+
+# Constant chunks at even indexes, field names at odd ones
+BODY_CHUNKS = tuple(re.split(r'\$(\w+)', BODY_HTML))
+
+def render_body(**values) -> str:
+    """Fill BODY_HTML by joining its constant chunks with the given values"""
+    parts = list(BODY_CHUNKS)
+    parts[1::2] = [values[name] for name in BODY_CHUNKS[1::2]]
+    return ''.join(parts)
+
+# Candidate locations for .env.real, in lookup order
+ENV_REAL_PATHS = [
+    Path('/workspace/.env.real'),
+    Path('/workspace/scripts/.env.real'),
+    Path('.env.real'),
+    Path('/app/.env.real')
+]
+
+def parse_env_file(env_path: Path) -> Dict[str, str]:
+    """Parse KEY=VALUE lines from an env file"""
+    env_vars = {}
+    with open(env_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                env_vars[key.strip()] = value.strip()
+    return env_vars
+
+@functools.lru_cache(maxsize=1)
+def load_env_real() -> Dict[str, str]:
+    """Load variables from the first readable .env.real file (parsed once per process)"""
+    for env_path in ENV_REAL_PATHS:
+        if env_path.exists():
+            try:
+                return parse_env_file(env_path)
+            except Exception as e:
+                continue
+    return {}
+
 class GmailEmailAction:
     def __init__(self):
         self.name = "EmailAction"
         self.enabled = True
+        self._smtp = None
+        self._smtp_lock = threading.Lock()
         self.load_gmail_config()
     
-    def load_env_real(self):
-        """Load environment variables from .env.real file"""
-        # Try multiple locations for .env.real
-        env_paths = [
-            Path('/workspace/.env.real'),
-            Path('/workspace/scripts/.env.real'),
-            Path('.env.real'),
-            Path('/app/.env.real')
-        ]
-        
-        for env_path in env_paths:
-            if env_path.exists():
-                try:
-                    with open(env_path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line and not line.startswith('#') and '=' in line:
-                                key, value = line.split('=', 1)
-                                os.environ[key.strip()] = value.strip()
-                    return True
-                except Exception as e:
-                    continue
-        return False
-    
     def load_gmail_config(self):
         """Load Gmail configuration from environment variables"""
         
-        # First try to load from .env.real file
-        env_loaded = self.load_env_real()
+        # Values from .env.real take precedence over the process environment
+        env = {**os.environ, **load_env_real()}
         
-        # Get environment variables
-        self.gmail_email = os.getenv('GMAIL_EMAIL', '')
-        self.gmail_app_password = os.getenv('GMAIL_APP_PASSWORD', '')
-        self.test_email = os.getenv('TEST_EMAIL', '')
-        self.use_real_email = os.getenv('USE_REAL_EMAIL', 'false').lower() == 'true'
+        self.gmail_email = env.get('GMAIL_EMAIL', '')
+        self.gmail_app_password = env.get('GMAIL_APP_PASSWORD', '')
+        self.test_email = env.get('TEST_EMAIL', '')
+        self.use_real_email = env.get('USE_REAL_EMAIL', 'false').lower() == 'true'
         
         # Gmail SMTP settings
         self.smtp_server = 'smtp.gmail.com'
         self.smtp_port = 587
+        self.smtp_timeout = 10  # seconds; a stalled server must not pin the lock and executor threads
         
         # Check if email is configured
         self.email_configured = bool(self.gmail_email and self.gmail_app_password and self.test_email)
@@ -67,21 +127,38 @@ class GmailEmailAction:
         priority = prediction.get("recommended_priority", "").lower()
         message = context.get("message", "").lower()
         
-        # Email trigger conditions
-        triggers = [
-            customer_tier in ["vip", "premium", "enterprise"],  # Premium customers
-            priority == "high",                                 # High priority issues
-            "urgent" in message,                               # Urgent keywords
-            "critical" in message,                             # Critical keywords
-            "emergency" in message,                            # Emergency keywords
-            "angry" in message,                                # Angry customers
-            "frustrated" in message,                           # Frustrated customers
-            "terrible" in message,                             # Negative sentiment
-            "awful" in message,                                # Negative sentiment
-            "billing" in message and "charge" in message      # Billing issues
-        ]
-        
-        return any(triggers)
+        # Email trigger conditions: premium customers, high priority issues,
+        # urgent/negative keywords, or billing charge complaints
+        return bool(
+            customer_tier in PREMIUM_TIERS
+            or priority == "high"
+            or TRIGGER_KEYWORDS_RE.search(message)
+            or BILLING_CHARGE_RE.search(message)
+        )
+    
+    def _get_smtp(self):
+        """Return the cached Gmail SMTP connection, reconnecting if it went stale"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close_smtp()
+        
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.smtp_timeout)
+        server.starttls()
+        server.login(self.gmail_email, self.gmail_app_password)
+        self._smtp = server
+        return server
+    
+    def _close_smtp(self):
+        """Drop the cached SMTP connection"""
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
     
     def send_gmail(self, to_email: str, subject: str, body: str) -> Dict[str, Any]:
         """Send real email via Gmail SMTP"""
@@ -93,11 +170,14 @@ class GmailEmailAction:
             msg['Subject'] = subject
             msg.attach(MIMEText(body, 'html'))
             
-            # Connect to Gmail SMTP server and send
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.gmail_email, self.gmail_app_password)
-                server.send_message(msg)
+            # Send over the persistent Gmail SMTP connection
+            with self._smtp_lock:
+                try:
+                    self._get_smtp().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Dropped between the NOOP check and the send; retry once
+                    self._close_smtp()
+                    self._get_smtp().send_message(msg)
             
             return {
                 "real_email_sent": True,
@@ -120,44 +200,31 @@ class GmailEmailAction:
         sentiment = prediction.get("sentiment", "neutral")
         confidence = prediction.get("confidence", 0)
         
+        # Formatted values shared by the subject and the body
+        priority_upper = priority.upper()
+        issue_title = issue_type.title()
+        
         # Current timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-        subject = f"🚨 [AI ALERT] {priority.upper()} Priority - {issue_type.title()} Issue"
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
+        subject = f"🚨 [AI ALERT] {priority_upper} Priority - {issue_title} Issue"
         
         # GET THE CUSTOMER MESSAGE FROM CONTEXT
         customer_message = context.get("message", "No message provided")
 
         # HTML email body
-        body = f"""
-        <html>
-        <body>
-        <h2>🤖 AI Customer Support Alert</h2>
-        
-        <table border="1" cellpadding="10" cellspacing="0" style="border-collapse: collapse;">
-        <tr><td><strong>Customer ID:</strong></td><td>{customer_id}</td></tr>
-        <tr><td><strong>Customer Message:</strong></td><td>{customer_message}</td></tr>
-        <tr><td><strong>Issue Type:</strong></td><td>{issue_type.title()}</td></tr>
-        <tr><td><strong>Priority:</strong></td><td><span style="color: {'red' if priority == 'high' else 'orange' if priority == 'medium' else 'green'};">{priority.upper()}</span></td></tr>
-        <tr><td><strong>Sentiment:</strong></td><td>{sentiment.title()}</td></tr>
-        <tr><td><strong>AI Confidence:</strong></td><td>{confidence:.1%}</td></tr>
-        <tr><td><strong>Timestamp:</strong></td><td>{timestamp}</td></tr>
-        </table>
-        
-        <p><strong>📋 Alert Summary:</strong></p>
-        <ul>
-        <li>A {priority} priority {issue_type} issue has been detected</li>
-        <li>Customer sentiment appears {sentiment}</li>
-        <li>AI prediction confidence: {confidence:.1%}</li>
-        </ul>
-        
-        <p><em>This is an automated alert from the AI Customer Support System.<br>
-        Please follow up with the customer promptly.</em></p>
-        
-        <hr>
-        <small>Generated at {timestamp}</small>
-        </body>
-        </html>
-        """.strip()
+        body = render_body(
+            customer_id=html.escape(str(customer_id)),
+            customer_message=html.escape(customer_message, quote=True),
+            issue_type=issue_type,
+            issue_title=issue_title,
+            priority=priority,
+            priority_upper=priority_upper,
+            priority_color=PRIORITY_COLORS.get(priority, 'green'),
+            sentiment=sentiment,
+            sentiment_title=sentiment.title(),
+            confidence_pct=f"{confidence:.1%}",
+            timestamp=timestamp
+        )
         
         # Determine recipient
         to_email = self.test_email if self.test_email else self.gmail_email
@@ -5,24 +5,130 @@ Ray Serve Customer Support AI Agent with Email and Analytics Actions
 
 import ray
 from ray import serve
+import asyncio
 import joblib
-import pandas as pd
 import numpy as np
-from scipy.sparse import hstack
+from scipy.sparse import csr_matrix
 import re
 import os
 import time
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List
+from collections import OrderedDict
+from starlette.responses import JSONResponse
 # Import email and analytics functionality
 import sys
-sys.path.append('/workspace/scripts')
+if '/workspace/scripts' not in sys.path:
+    sys.path.append('/workspace/scripts')
 from deploy_email import GmailEmailAction
 from deploy_analytics import AnalyticsAction
 
-@serve.deployment(num_replicas=1)
+try:
+    import orjson
+    loads_json = orjson.loads
+    
+    def dumps_json(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    loads_json = json.loads
+    
+    def dumps_json(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is available"""
+    
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+# Per-request logging stays off the hot path unless explicitly enabled
+log = logging.getLogger("cs_agent")
+log.setLevel(os.environ.get("CS_AGENT_LOGLEVEL", "WARNING").upper())
+if not log.handlers:
+    log.addHandler(logging.StreamHandler())
+
+# Artifacts written by the training pipeline
+MODEL_FILES = (
+    "tfidf_vectorizer.pkl",
+    "issue_classifier.pkl",
+    "sentiment_classifier.pkl",
+    "satisfaction_regressor.pkl",
+)
+
+# Replica autoscaling for the AI deployment
+MIN_REPLICAS = int(os.environ.get("CS_AGENT_MIN_REPLICAS", "1"))
+MAX_REPLICAS = int(os.environ.get("CS_AGENT_MAX_REPLICAS", "8"))
+TARGET_ONGOING_REQUESTS = int(os.environ.get("CS_AGENT_TARGET_ONGOING_REQUESTS", "5"))
+
+# Dynamic request batching for the model calls
+MAX_BATCH_SIZE = int(os.environ.get("CS_AGENT_MAX_BATCH_SIZE", "32"))
+BATCH_WAIT_TIMEOUT_S = float(os.environ.get("CS_AGENT_BATCH_WAIT_TIMEOUT_S", "0.01"))
+
+# Memoized predictions for repeated messages
+PREDICTION_CACHE_SIZE = int(os.environ.get("CS_AGENT_PREDICTION_CACHE_SIZE", "4096"))
+PREDICTION_CACHE_MAX_MESSAGE_LEN = 2048
+
+# How long a request waits for a background email before reporting it pending
+EMAIL_RESULT_WAIT_S = float(os.environ.get("CS_AGENT_EMAIL_RESULT_WAIT_S", "0.05"))
+
+def union_patterns(patterns):
+    """Compile a list of regexes into one alternation scanned in a single pass.
+
+    Each category's patterns match disjoint tokens, so the match count of the
+    union equals the sum of the per-pattern counts used in training.
+    """
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
+@serve.deployment(
+    autoscaling_config={
+        "min_replicas": MIN_REPLICAS,
+        "max_replicas": MAX_REPLICAS,
+        "target_num_ongoing_requests_per_replica": TARGET_ONGOING_REQUESTS,
+    },
+    ray_actor_options={"num_cpus": 1}
+)
 class CustomerSupportAgent:
+    # Negative sentiment indicators
+    NEGATIVE_RE = union_patterns([
+        r'\b(bad|terrible|awful|horrible|worst|hate|angry|frustrated|disappointed)\b',
+        r'\b(can\'t|cannot|won\'t|don\'t|never|no|not)\b',
+        r'\b(lost|missing|broken|damaged|wrong|error|fail|problem)\b',
+        r'[!]{2,}',  # Multiple exclamation marks
+        r'[?]{2,}'   # Multiple question marks
+    ])
+    
+    # Positive sentiment indicators
+    POSITIVE_RE = union_patterns([
+        r'\b(great|excellent|amazing|wonderful|fantastic|perfect|love|thank|good)\b',
+        r'\b(yes|absolutely|definitely|sure|of course)\b'
+    ])
+    
+    # Urgency indicators
+    URGENCY_RE = union_patterns([
+        r'\b(urgent|asap|immediately|quickly|fast|emergency|critical)\b',
+        r'\b(help|please|need)\b',
+        r'[!]{1,}'  # Exclamation marks
+    ])
+    
+    # (sentiment, satisfaction) -> recommended priority; anything else is 'medium'
+    PRIORITY_TABLE = {
+        ('negative', 'low'): 'high',
+        ('negative', 'medium'): 'high',
+        ('negative', 'high'): 'high',
+        ('neutral', 'low'): 'high',
+        ('positive', 'low'): 'high',
+        ('positive', 'high'): 'low',
+    }
+    
     def __init__(self):
         self.model_dir = "/workspace/models"
         self.is_ready = False
+        # LRU cache of model outputs keyed by normalized message
+        self.prediction_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
         # Initialize actions
         self.email_action = GmailEmailAction()
         self.analytics_action = AnalyticsAction()
@@ -30,90 +136,162 @@ class CustomerSupportAgent:
     
     def load_models(self):
         try:
-            print("🤖 Loading Customer Support AI model components...")
+            log.info("🤖 Loading Customer Support AI model components...")
+            
+            models = self.read_model_files()
             
-            self.vectorizer = joblib.load(f"{self.model_dir}/tfidf_vectorizer.pkl")
-            self.issue_classifier = joblib.load(f"{self.model_dir}/issue_classifier.pkl")
-            self.sentiment_classifier = joblib.load(f"{self.model_dir}/sentiment_classifier.pkl")
-            self.satisfaction_regressor = joblib.load(f"{self.model_dir}/satisfaction_regressor.pkl")
+            self.vectorizer = models["tfidf_vectorizer.pkl"]
+            self.issue_classifier = models["issue_classifier.pkl"]
+            self.sentiment_classifier = models["sentiment_classifier.pkl"]
+            self.satisfaction_regressor = models["satisfaction_regressor.pkl"]
             
-            print(f"Vectorizer vocabulary size: {len(self.vectorizer.vocabulary_)}")
-            print("✅ All model components loaded successfully!")
+            if hasattr(self.vectorizer, 'vocabulary_'):
+                log.info(f"Vectorizer vocabulary size: {len(self.vectorizer.vocabulary_)}")
+            else:
+                log.info(f"Hashed text feature size: {self.vectorizer[0].n_features}, "
+                         f"{self.vectorizer[-1].idf_.shape[0]} kept")
+            log.info("✅ All model components loaded successfully!")
+            
+            # Pay first-call costs now so readiness means the first request is fast
+            for _ in range(2):
+                self.run_models(["warmup message for initialization"])
+            log.info("🔥 Models warmed up")
             self.is_ready = True
             
         except Exception as e:
-            print(f"❌ Error loading models: {e}")
+            log.error(f"❌ Error loading models: {e}")
             raise
 
-    def add_features(self, df):
-        """Add engineered features exactly like training"""
-        # Add text length features
-        df['message_length'] = df['message'].str.len()
-        df['word_count'] = df['message'].str.split().str.len()
-        
-        # Add negative sentiment indicators
-        negative_patterns = [
-            r'\b(bad|terrible|awful|horrible|worst|hate|angry|frustrated|disappointed)\b',
-            r'\b(can\'t|cannot|won\'t|don\'t|never|no|not)\b',
-            r'\b(lost|missing|broken|damaged|wrong|error|fail|problem)\b',
-            r'[!]{2,}',  # Multiple exclamation marks
-            r'[?]{2,}'   # Multiple question marks
-        ]
-        
-        df['negative_indicators'] = 0
-        for pattern in negative_patterns:
-            df['negative_indicators'] += df['message'].str.count(pattern, flags=re.IGNORECASE)
+    def read_model_files(self) -> Dict[str, object]:
+        """Load the model artifacts from the model directory"""
+        # One directory listing instead of a stat per artifact
+        present = {entry.name for entry in os.scandir(self.model_dir)}
+        missing = [name for name in MODEL_FILES if name not in present]
+        if missing:
+            raise FileNotFoundError(f"Missing model artifacts in {self.model_dir}: {missing}")
         
-        # Add positive sentiment indicators
-        positive_patterns = [
-            r'\b(great|excellent|amazing|wonderful|fantastic|perfect|love|thank|good)\b',
-            r'\b(yes|absolutely|definitely|sure|of course)\b'
-        ]
+        # Memory-map the (uncompressed) arrays so replicas share page cache
+        return {
+            name: joblib.load(os.path.join(self.model_dir, name), mmap_mode="r")
+            for name in MODEL_FILES
+        }
+
+    def engineer_features(self, message: str) -> List[int]:
+        """Engineered features for one message, computed exactly like training"""
+        negative_indicators = len(self.NEGATIVE_RE.findall(message))
+        positive_indicators = len(self.POSITIVE_RE.findall(message))
+        urgency_indicators = len(self.URGENCY_RE.findall(message))
         
-        df['positive_indicators'] = 0
-        for pattern in positive_patterns:
-            df['positive_indicators'] += df['message'].str.count(pattern, flags=re.IGNORECASE)
-            
-        # Add urgency indicators
-        urgency_patterns = [
-            r'\b(urgent|asap|immediately|quickly|fast|emergency|critical)\b',
-            r'\b(help|please|need)\b',
-            r'[!]{1,}'  # Exclamation marks
+        return [
+            len(message),           # message_length
+            len(message.split()),   # word_count
+            negative_indicators,
+            positive_indicators,
+            urgency_indicators
         ]
-        
-        df['urgency_indicators'] = 0
-        for pattern in urgency_patterns:
-            df['urgency_indicators'] += df['message'].str.count(pattern, flags=re.IGNORECASE)
-            
-        return df
 
-    def prepare_features(self, customer_message: str):
-        """Prepare features exactly like training"""
+    def prepare_features(self, messages: List[str]):
+        """Prepare features exactly like training, one row per message"""
         try:
-            # Create DataFrame with message
-            df = pd.DataFrame([{'message': customer_message}])
-            
-            # Add engineered features exactly like training
-            df = self.add_features(df)
-            
             # Prepare text features
-            X_text = self.vectorizer.transform(df['message'])
+            X_text = self.vectorizer.transform(messages)
             
-            # Combine text features with engineered features
-            feature_cols = ['message_length', 'word_count', 'negative_indicators', 
-                           'positive_indicators', 'urgency_indicators']
-            X_features = df[feature_cols].values
+            # Engineered features, in training column order
+            X_features = np.array([self.engineer_features(m) for m in messages], dtype=np.float32)
+            n_rows, n_extra = X_features.shape
+            n_text = X_text.shape[1]
             
-            # Combine all features exactly like training
-            X_combined = hstack([X_text, X_features])
+            # Combine all features exactly like training, assembling the CSR
+            # arrays directly: each row's text entries followed by its
+            # engineered columns (float32, which is what the forests predict on)
+            indptr = X_text.indptr + n_extra * np.arange(n_rows + 1)
+            extra_pos = (indptr[1:] - n_extra)[:, None] + np.arange(n_extra)
+            is_text = np.ones(indptr[-1], dtype=bool)
+            is_text[extra_pos] = False
             
-            return X_combined
+            data = np.empty(indptr[-1], dtype=np.float32)
+            indices = np.empty(indptr[-1], dtype=np.int32)
+            data[is_text] = X_text.data
+            indices[is_text] = X_text.indices
+            data[extra_pos] = X_features
+            indices[extra_pos] = n_text + np.arange(n_extra)
+            
+            return csr_matrix(
+                (data, indices, indptr.astype(np.int32)),
+                shape=(n_rows, n_text + n_extra)
+            )
             
         except Exception as e:
-            print(f"❌ Error in prepare_features: {e}")
+            log.error(f"❌ Error in prepare_features: {e}")
             raise
 
+    async def predict(self, customer_message: str):
+        """Return (predictions, cache_hit) for a message, reusing recent results"""
+        # The featurizer ignores case (lowercasing vectorizer, IGNORECASE regexes),
+        # so only case is folded into the key; padding changes message_length
+        key = customer_message.lower()
+        
+        # Very long messages are unlikely to repeat; don't let them fill the cache
+        if len(key) > PREDICTION_CACHE_MAX_MESSAGE_LEN:
+            return await self.predict_batch(customer_message), False
+        
+        cached = self.prediction_cache.get(key)
+        if cached is not None:
+            self.prediction_cache.move_to_end(key)
+            self.cache_hits += 1
+            return cached, True
+        
+        self.cache_misses += 1
+        result = await self.predict_batch(customer_message)
+        self.prediction_cache[key] = result
+        if len(self.prediction_cache) > PREDICTION_CACHE_SIZE:
+            self.prediction_cache.popitem(last=False)
+        return result, False
+
+    @serve.batch(max_batch_size=MAX_BATCH_SIZE, batch_wait_timeout_s=BATCH_WAIT_TIMEOUT_S)
+    async def predict_batch(self, messages: List[str]) -> List[tuple]:
+        """Run all models once over a batch of concurrently received messages"""
+        return self.run_models(messages)
+
+    def run_models(self, messages: List[str]) -> List[tuple]:
+        """Predict (issue, sentiment, satisfaction, confidences) for each message"""
+        features = self.prepare_features(messages)
+        
+        # predict() is argmax over predict_proba(); derive both from one pass
+        issue_proba = self.issue_classifier.predict_proba(features)
+        issue_idx = issue_proba.argmax(axis=1)
+        issue_preds = self.issue_classifier.classes_[issue_idx]
+        issue_confidences = issue_proba[np.arange(len(messages)), issue_idx]
+        
+        sentiment_proba = self.sentiment_classifier.predict_proba(features)
+        sentiment_idx = sentiment_proba.argmax(axis=1)
+        sentiment_preds = self.sentiment_classifier.classes_[sentiment_idx]
+        sentiment_confidences = sentiment_proba[np.arange(len(messages)), sentiment_idx]
+        
+        satisfaction_preds = self.satisfaction_regressor.predict(features)
+        
+        return [
+            (issue_preds[i], sentiment_preds[i], satisfaction_preds[i],
+             float(issue_confidences[i]), float(sentiment_confidences[i]))
+            for i in range(len(messages))
+        ]
+
+    def report_email_result(self, future):
+        """Log the outcome of an email that finished after its response was sent"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            log.error(f"❌ Email action failed: {error}")
+
     async def __call__(self, request):
+        result = await self.handle(request)
+        if hasattr(request, 'body'):
+            # Serialize HTTP responses ourselves instead of via the stdlib encoder
+            return ORJSONResponse(result)
+        return result
+
+    async def handle(self, request):
         if not self.is_ready:
             return {"error": "Model not loaded", "status": "failed"}
         
@@ -121,8 +299,8 @@ class CustomerSupportAgent:
         start_time = time.time()
         
         try:
-            if hasattr(request, 'json'):
-                data = await request.json()
+            if hasattr(request, 'body'):
+                data = loads_json(await request.body())
             else:
                 data = request
             
@@ -134,31 +312,14 @@ class CustomerSupportAgent:
             if not customer_message:
                 return {"error": "No message provided", "status": "failed"}
             
-            print(f"🔍 Processing: {customer_id} - '{customer_message[:50]}...'")
+            log.debug("🔍 Processing: %s - '%.50s...'", customer_id, customer_message)
             
-            # Prepare features exactly like training
-            features = self.prepare_features(customer_message)
-            
-            # Make predictions
-            issue_pred = self.issue_classifier.predict(features)[0]
-            sentiment_pred = self.sentiment_classifier.predict(features)[0] 
-            satisfaction_pred = self.satisfaction_regressor.predict(features)[0]
-            
-            # Get confidence
-            issue_confidence = float(self.issue_classifier.predict_proba(features)[0].max())
-            sentiment_confidence = float(self.sentiment_classifier.predict_proba(features)[0].max())
+            # Make predictions (cached, or batched with other in-flight requests)
+            (issue_pred, sentiment_pred, satisfaction_pred,
+             issue_confidence, sentiment_confidence), cache_hit = await self.predict(customer_message)
             
             # Determine priority based on sentiment and satisfaction
-            if sentiment_pred == 'negative' and satisfaction_pred == 'low':
-                priority = 'high'
-            elif sentiment_pred == 'positive' and satisfaction_pred == 'high':
-                priority = 'low'
-            elif sentiment_pred == 'negative':
-                priority = 'high'
-            elif satisfaction_pred == 'low':
-                priority = 'high'
-            else:
-                priority = 'medium'
+            priority = self.PRIORITY_TABLE.get((sentiment_pred, satisfaction_pred), 'medium')
             
             # Calculate response time for analytics
             response_time_ms = int((time.time() - start_time) * 1000)
@@ -166,6 +327,7 @@ class CustomerSupportAgent:
             # Execute actions
             actions_executed = []
             actions_skipped = []
+            actions_scheduled = []
             action_results = {}
             
             prediction = {
@@ -180,20 +342,30 @@ class CustomerSupportAgent:
                 'customer_id': customer_id,
                 'tier': customer_tier,
                 'message': customer_message,
-                'response_time_ms': response_time_ms
+                'response_time_ms': response_time_ms,
+                'cache_hit': cache_hit
             }
             
-            # Execute Email Action
+            # Execute Email Action off the request path so SMTP never delays the reply
             try:
                 if self.email_action.should_execute(prediction, customer_context):
-                    email_result = self.email_action.execute(prediction, customer_context)
+                    email_future = asyncio.get_running_loop().run_in_executor(
+                        None, self.email_action.execute, dict(prediction), customer_context
+                    )
+                    try:
+                        action_results["EmailAction"] = await asyncio.wait_for(
+                            asyncio.shield(email_future), timeout=EMAIL_RESULT_WAIT_S
+                        )
+                    except asyncio.TimeoutError:
+                        email_future.add_done_callback(self.report_email_result)
+                        action_results["EmailAction"] = {"status": "pending"}
+                        actions_scheduled.append("EmailAction")
                     actions_executed.append("EmailAction")
-                    action_results["EmailAction"] = email_result
                 else:
                     actions_skipped.append("EmailAction")
                     
             except Exception as e:
-                print(f"❌ Email action failed: {e}")
+                log.error(f"❌ Email action failed: {e}")
                 action_results["EmailAction"] = {"error": str(e)}
                 actions_skipped.append("EmailAction")
             
@@ -206,7 +378,7 @@ class CustomerSupportAgent:
                 action_results["AnalyticsAction"] = analytics_result
                     
             except Exception as e:
-                print(f"❌ Analytics action failed: {e}")
+                log.error(f"❌ Analytics action failed: {e}")
                 action_results["AnalyticsAction"] = {"error": str(e)}
                 actions_skipped.append("AnalyticsAction")
             
@@ -219,34 +391,33 @@ class CustomerSupportAgent:
                 "predicted_satisfaction": satisfaction_pred,
                 "confidence": round((issue_confidence + sentiment_confidence) / 2, 3),
                 "recommended_priority": priority,
-                "timestamp": pd.Timestamp.now().isoformat(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "cache_hit": cache_hit,
                 "actions_executed": actions_executed,
                 "actions_skipped": actions_skipped,
+                "actions_scheduled": actions_scheduled,
                 "action_results": action_results
             }
             
-            print(f"✅ Prediction: {issue_pred} | {sentiment_pred} | {satisfaction_pred} | {priority}")
+            log.debug("✅ Prediction: %s | %s | %s | %s", issue_pred, sentiment_pred, satisfaction_pred, priority)
             return response
             
         except Exception as e:
-            print(f"❌ Prediction error: {str(e)}")
+            log.error(f"❌ Prediction error: {str(e)}")
             return {"error": str(e), "status": "failed"}
 
 @serve.deployment
 class AnalyticsEndpoint:
     def __init__(self):
         try:
-            import sys
-            sys.path.append('/workspace/scripts')
-            from deploy_analytics import AnalyticsAction
             self.analytics_action = AnalyticsAction()
         except Exception as e:
-            print(f"❌ Failed to load analytics: {e}")
+            log.error(f"❌ Failed to load analytics: {e}")
             self.analytics_action = None
     
     async def __call__(self, request):
         if not self.analytics_action:
-            return {"error": "Analytics not available"}
+            return ORJSONResponse({"error": "Analytics not available"})
         
         try:
             # Get query parameters
@@ -256,26 +427,22 @@ class AnalyticsEndpoint:
                 days = 7
             
             summary = self.analytics_action.get_summary(days)
-            return summary
+            return ORJSONResponse(summary)
             
         except Exception as e:
-            return {"error": str(e)}
+            return ORJSONResponse({"error": str(e)})
 
 @serve.deployment
 class HealthCheck:
     def __init__(self):
         try:
-            import sys
-            sys.path.append('/workspace/scripts')
-            from deploy_email import GmailEmailAction
-            from deploy_analytics import AnalyticsAction
             self.email_action = GmailEmailAction()
             self.analytics_action = AnalyticsAction()
         except:
             self.email_action = None
             self.analytics_action = None
-    
-    async def __call__(self, request):
+        
+        # Action configuration is fixed at startup, so build the payload once
         email_status = "not_configured"
         if self.email_action:
             if self.email_action.email_configured and self.email_action.use_real_email:
@@ -285,12 +452,15 @@ class HealthCheck:
         
         analytics_status = "available" if self.analytics_action else "not_available"
         
-        return {
+        self.status = {
             "status": "healthy", 
             "service": "customer-support-ai-with-actions",
             "email_status": email_status,
             "analytics_status": analytics_status
         }
+    
+    async def __call__(self, request):
+        return ORJSONResponse(self.status)
 
 def main():
     try:
@@ -34,17 +34,14 @@ def test_gmail_methods():
         msg['From'] = gmail_email
         msg['To'] = gmail_email
         
-        # Connect and send
+        # Connect and send (implicit TLS saves the STARTTLS round trip)
         print("📡 Connecting to Gmail SMTP...")
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        
-        print("🔐 Authenticating...")
-        server.login(gmail_email, password)
-        
-        print("📧 Sending test email...")
-        server.send_message(msg)
-        server.quit()
+        with smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=10) as server:
+            print("🔐 Authenticating...")
+            server.login(gmail_email, password)
+            
+            print("📧 Sending test email...")
+            server.send_message(msg)
         
         print(f"✅ SUCCESS! {auth_type} authentication works!")
         print(f"📬 Check your inbox: {gmail_email}")
@@ -4,7 +4,12 @@ Action Manager - orchestrates all customer support actions
 
 import importlib
 import inspect
+import pkgutil
 import asyncio
+import copy
+import functools
+import operator
+import os
 from typing import Dict, Any, List, Type
 from pathlib import Path
 import logging
@@ -12,24 +17,59 @@ import json
 
 from .base_action import BaseAction
 
+try:
+    from orjson import loads as loads_json
+except ImportError:
+    loads_json = json.loads  # also accepts bytes
+
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=8)
+def _read_config(config_file: str, mtime_ns: int):
+    """Parse config_file once per modification time; callers get copies"""
+    return loads_json(Path(config_file).read_bytes())
+
+@functools.lru_cache(maxsize=None)
+def discover_action_classes(actions_dir: Path) -> tuple:
+    """Import every *_action module in actions_dir once per process and return its action classes"""
+    action_classes = []
+    for module_info in pkgutil.iter_modules([str(actions_dir)]):
+        if not module_info.name.endswith('_action'):
+            continue
+        try:
+            module = importlib.import_module(f"actions.{module_info.name}")
+            
+            for obj in vars(module).values():
+                if (isinstance(obj, type) and 
+                    issubclass(obj, BaseAction) and 
+                    obj is not BaseAction):
+                    action_classes.append(obj)
+                    
+        except Exception as e:
+            logger.warning("Failed to load action from %s: %s", module_info.name, e)
+    
+    return tuple(action_classes)
+
 class ActionManager:
     """Manages and orchestrates customer support actions"""
     
-    def __init__(self, config_file: str = None):
+    def __init__(self, config_file: str = None, smtp_pool=None):
         self.actions: List[BaseAction] = []
         self.config = self._load_config(config_file)
         self.results = {}
+        self._sorted = True  # actions are kept in priority order lazily
+        # Shared SMTP connection pool handed to actions that send email
+        self.smtp_pool = smtp_pool
         
     def _load_config(self, config_file: str = None) -> Dict[str, Any]:
         """Load action configuration"""
-        if config_file and Path(config_file).exists():
+        if config_file:
             try:
-                with open(config_file, 'r') as f:
-                    return json.load(f)
+                return copy.deepcopy(_read_config(config_file, os.stat(config_file).st_mtime_ns))
+            except FileNotFoundError:
+                pass
             except Exception as e:
-                logger.warning(f"Failed to load config from {config_file}: {e}")
+                logger.warning("Failed to load config from %s: %s", config_file, e)
         
         # Default configuration
         return {
@@ -47,8 +87,10 @@ class ActionManager:
     def register_action(self, action_class: Type[BaseAction], **kwargs) -> bool:
         """Register a new action"""
         try:
-            action_name = action_class.__name__.lower().replace('action', '')
-            action_config = self.config.get('actions', {}).get(action_name, {})
+            action_config = self.config.get('actions', {}).get(action_class._config_key, {})
+            
+            if self.smtp_pool is not None and 'smtp_pool' in inspect.signature(action_class).parameters:
+                kwargs.setdefault('smtp_pool', self.smtp_pool)
             
             action = action_class(config=action_config, **kwargs)
             
@@ -59,40 +101,32 @@ class ActionManager:
                 action.enabled = action_config['enabled']
             
             self.actions.append(action)
-            self.actions.sort(key=lambda x: x.priority)
+            self._sorted = False
             
-            logger.info(f"Registered action: {action.name} (priority: {action.priority}, enabled: {action.enabled})")
+            logger.info("Registered action: %s (priority: %s, enabled: %s)", action.name, action.priority, action.enabled)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to register action {action_class.__name__}: {e}")
+            logger.error("Failed to register action %s: %s", action_class.__name__, e)
             return False
     
+    def _ensure_sorted(self):
+        """Sort actions by priority once after a batch of registrations"""
+        if not self._sorted:
+            self.actions.sort(key=operator.attrgetter('priority'))
+            self._sorted = True
+    
     def auto_discover_actions(self, actions_dir: str = None) -> int:
         """Auto-discover and register actions from directory"""
         if actions_dir is None:
             actions_dir = Path(__file__).parent
         
-        actions_dir = Path(actions_dir)
         discovered = 0
+        for action_class in discover_action_classes(Path(actions_dir).resolve()):
+            if self.register_action(action_class):
+                discovered += 1
         
-        for action_file in actions_dir.glob("*_action.py"):
-            try:
-                module_name = f"actions.{action_file.stem}"
-                module = importlib.import_module(module_name)
-                
-                for name, obj in inspect.getmembers(module):
-                    if (inspect.isclass(obj) and 
-                        issubclass(obj, BaseAction) and 
-                        obj != BaseAction):
-                        
-                        if self.register_action(obj):
-                            discovered += 1
-                            
-            except Exception as e:
-                logger.warning(f"Failed to load action from {action_file}: {e}")
-        
-        logger.info(f"Auto-discovered {discovered} actions")
+        logger.info("Auto-discovered %s actions", discovered)
         return discovered
     
     async def execute_actions(self, ai_response: Dict[str, Any], customer_context: Dict[str, Any]) -> Dict[str, Any]:
@@ -105,8 +139,10 @@ class ActionManager:
             'results': {}
         }
         
+        self._ensure_sorted()
         applicable_actions = []
         for action in self.actions:
+            # Checked per event: enable()/disable() can flip this at any time
             if not action.enabled:
                 execution_results['skipped'].append({
                     'action': action.name,
@@ -123,7 +159,7 @@ class ActionManager:
                         'reason': 'conditions_not_met'
                     })
             except Exception as e:
-                logger.error(f"Error checking if {action.name} should execute: {e}")
+                logger.error("Error checking if %s should execute: %s", action.name, e)
                 execution_results['failed'].append({
                     'action': action.name,
                     'error': str(e),
@@ -137,32 +173,34 @@ class ActionManager:
         timeout = self.config.get('execution', {}).get('timeout', 30)
         
         if parallel_execution:
-            tasks = []
-            for action in applicable_actions:
-                task = asyncio.create_task(
+            tasks = [
+                (action, asyncio.create_task(
                     self._execute_single_action(action, ai_response, customer_context)
-                )
-                tasks.append((action, task))
+                ))
+                for action in applicable_actions
+            ]
+            
+            # One deadline for the whole batch instead of a timer per task
+            done, pending = await asyncio.wait([task for _, task in tasks], timeout=timeout)
+            for task in pending:
+                task.cancel()
             
             for action, task in tasks:
-                try:
-                    result = await asyncio.wait_for(task, timeout=timeout)
-                    execution_results['executed'].append(action.name)
-                    execution_results['results'][action.name] = result
-                    
-                except asyncio.TimeoutError:
+                if task in pending:
                     execution_results['failed'].append({
                         'action': action.name,
                         'error': 'timeout',
                         'phase': 'execution'
                     })
-                    
-                except Exception as e:
+                elif task.exception() is not None:
                     execution_results['failed'].append({
                         'action': action.name,
-                        'error': str(e),
+                        'error': str(task.exception()),
                         'phase': 'execution'
                     })
+                else:
+                    execution_results['executed'].append(action.name)
+                    execution_results['results'][action.name] = task.result()
         else:
             for action in applicable_actions:
                 try:
@@ -184,17 +222,18 @@ class ActionManager:
     
     async def _execute_single_action(self, action: BaseAction, ai_response: Dict[str, Any], customer_context: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single action with error handling"""
-        logger.info(f"Executing action: {action.name}")
+        logger.info("Executing action: %s", action.name)
         
         try:
             result = await action.execute(ai_response, customer_context)
-            logger.info(f"Action {action.name} completed successfully")
+            logger.info("Action %s completed successfully", action.name)
             return result
             
         except Exception as e:
-            logger.error(f"Action {action.name} failed: {e}")
+            logger.error("Action %s failed: %s", action.name, e)
             raise
     
     def get_action_status(self) -> List[Dict[str, Any]]:
         """Get status of all registered actions"""
+        self._ensure_sorted()
         return [action.get_metadata() for action in self.actions]
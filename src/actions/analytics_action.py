@@ -12,6 +12,25 @@ import os
 
 from .base_action import BaseAction
 
+try:
+    import orjson
+    
+    def _orjson_default(obj):
+        # orjson rejects float subclasses that json.dumps writes as plain floats
+        if isinstance(obj, float):
+            return float(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def dumps_line(obj) -> bytes:
+        return orjson.dumps(
+            obj,
+            default=_orjson_default,
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+except ImportError:
+    def dumps_line(obj) -> bytes:
+        return (json.dumps(obj) + '\n').encode()
+
 logger = logging.getLogger(__name__)
 
 class AnalyticsAction(BaseAction):
@@ -78,8 +97,8 @@ class AnalyticsAction(BaseAction):
     def _log_to_file(self, analytics_record: Dict[str, Any]):
         """Log to JSONL file (backward compatibility)"""
         try:
-            with open(self.analytics_file, 'a') as f:
-                f.write(json.dumps(analytics_record) + '\n')
+            with open(self.analytics_file, 'ab') as f:
+                f.write(dumps_line(analytics_record))
         except Exception as e:
             logger.error(f"File logging failed: {e}")
     
@@ -11,6 +11,12 @@ logger = logging.getLogger(__name__)
 class BaseAction(ABC):
     """Base class for all customer support actions"""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Key of this action's section in the manager config, e.g. EmailAction -> 'email'
+        name = cls.__name__.lower()
+        cls._config_key = name[:-len('action')] if name.endswith('action') else name
+    
     def __init__(self, config: Dict[str, Any] = None):
         self.config = config or {}
         self.enabled = True
@@ -293,5 +293,6 @@ Management Team
 GMAIL_SMTP_CONFIG = {
     'smtp_server': 'smtp.gmail.com',
     'smtp_port': 587,
-    'use_tls': True
+    'use_tls': True,
+    'timeout': 10  # seconds; bounds executor threads blocked on a dead server
 }
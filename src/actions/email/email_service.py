@@ -1,26 +1,74 @@
 import smtplib
 import os
 import json
+import atexit
+import threading
+import weakref
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from .email_config import TEAM_EMAILS, EMAIL_TEMPLATES, ISSUE_TEAM_MAPPING, TeamType, GMAIL_SMTP_CONFIG
+from .smtp_pool import SMTPPool
+
+# Services with a possibly open SMTP session, closed once at interpreter exit
+_LIVE_SERVICES = weakref.WeakSet()
+
+@atexit.register
+def _close_live_services():
+    for service in list(_LIVE_SERVICES):
+        service.close()
 
 class RealEmailService:
     """
     Real email service for production customer support notifications
     """
     
-    def __init__(self, gmail_email: str = None, gmail_password: str = None, use_real_email: bool = False):
+    def __init__(self, gmail_email: str = None, gmail_password: str = None, use_real_email: bool = False,
+                 smtp: Optional[smtplib.SMTP] = None, pool: Optional[SMTPPool] = None):
         self.gmail_email = gmail_email or os.getenv('GMAIL_EMAIL')
         self.gmail_password = gmail_password or os.getenv('GMAIL_APP_PASSWORD')  # Use App Password for Gmail
         self.use_real_email = use_real_email
         self.sent_emails = []
         
+        # Authenticated SMTP session reused across sends (optionally preconnected),
+        # or a shared pool when several senders run concurrently
+        self._smtp = smtp
+        self.pool = pool
+        self._smtp_lock = threading.Lock()
+        _LIVE_SERVICES.add(self)
+        
         if self.use_real_email and not (self.gmail_email and self.gmail_password):
             raise ValueError("Gmail credentials required for real email sending")
     
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the cached SMTP session, re-dialing only if it went stale"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.close()
+        
+        server = smtplib.SMTP(GMAIL_SMTP_CONFIG['smtp_server'], GMAIL_SMTP_CONFIG['smtp_port'],
+                              timeout=GMAIL_SMTP_CONFIG['timeout'])
+        if GMAIL_SMTP_CONFIG['use_tls']:
+            server.starttls()
+        server.login(self.gmail_email, self.gmail_password)
+        self._smtp = server
+        return server
+    
+    def close(self):
+        """Close the cached SMTP session, if any"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+    
     def send_team_assignment(self, ai_response: Dict, customer_context: Dict = None) -> Dict:
         """
         Send ticket assignment to the appropriate team based on AI analysis
@@ -178,17 +226,18 @@ class RealEmailService:
                 # Add body
                 msg.attach(MIMEText(body, 'plain'))
                 
-                # Connect to Gmail SMTP
-                server = smtplib.SMTP(GMAIL_SMTP_CONFIG['smtp_server'], GMAIL_SMTP_CONFIG['smtp_port'])
-                
-                if GMAIL_SMTP_CONFIG['use_tls']:
-                    server.starttls()
-                
-                # Login and send
-                server.login(self.gmail_email, self.gmail_password)
+                # Send over the persistent Gmail SMTP session
                 text = msg.as_string()
-                server.sendmail(self.gmail_email, recipients, text)
-                server.quit()
+                if self.pool is not None:
+                    self.pool.sendmail(self.gmail_email, recipients, text)
+                else:
+                    with self._smtp_lock:
+                        try:
+                            self._get_smtp().sendmail(self.gmail_email, recipients, text)
+                        except smtplib.SMTPServerDisconnected:
+                            # Dropped between the NOOP check and the send; retry once
+                            self.close()
+                            self._get_smtp().sendmail(self.gmail_email, recipients, text)
                 
                 print(f"✅ REAL EMAIL SENT SUCCESSFULLY!")
                 print(f"📧 To: {', '.join(recipients)}")
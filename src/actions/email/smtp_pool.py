@@ -0,0 +1,81 @@
+import atexit
+import functools
+import queue
+import smtplib
+import threading
+from dataclasses import dataclass
+from typing import List
+
+from .email_config import GMAIL_SMTP_CONFIG
+
+@dataclass
+class PooledConnection:
+    server: smtplib.SMTP
+    sent: int = 0
+
+class SMTPPool:
+    """
+    Bounded pool of authenticated SMTP connections shared by concurrent senders
+    """
+
+    def __init__(self, gmail_email: str, gmail_password: str, size: int = 5, max_messages: int = 100):
+        self.gmail_email = gmail_email
+        self.gmail_password = gmail_password
+        self.max_messages = max_messages  # Rotate connections after this many sends
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> PooledConnection:
+        server = smtplib.SMTP(GMAIL_SMTP_CONFIG['smtp_server'], GMAIL_SMTP_CONFIG['smtp_port'],
+                              timeout=GMAIL_SMTP_CONFIG['timeout'])
+        if GMAIL_SMTP_CONFIG['use_tls']:
+            server.starttls()
+        server.login(self.gmail_email, self.gmail_password)
+        return PooledConnection(server)
+
+    def _discard(self, conn: PooledConnection):
+        try:
+            conn.server.quit()
+        except Exception:
+            pass
+
+    def sendmail(self, from_addr: str, to_addrs: List[str], msg: str):
+        """Send one message on a pooled connection, dialing only when none is idle"""
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+
+            try:
+                try:
+                    conn.server.sendmail(from_addr, to_addrs, msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Went stale while idle; replace it and retry once
+                    self._discard(conn)
+                    conn = self._connect()
+                    conn.server.sendmail(from_addr, to_addrs, msg)
+            except Exception:
+                self._discard(conn)
+                raise
+
+            conn.sent += 1
+            if conn.sent >= self.max_messages:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        """Quit every idle connection"""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+@functools.lru_cache(maxsize=None)
+def shared_pool(gmail_email: str, gmail_password: str) -> SMTPPool:
+    """One pool per Gmail account for the whole process"""
+    pool = SMTPPool(gmail_email, gmail_password)
+    atexit.register(pool.close)
+    return pool
@@ -16,17 +16,18 @@ logger = logging.getLogger(__name__)
 class EmailAction(BaseAction):
     """Email action that uses the existing email service"""
     
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, smtp_pool=None):
         super().__init__(config)
         self.priority = 10  # High priority
         self.email_service = None
-        self._initialize_email_service()
+        self._initialize_email_service(smtp_pool)
     
-    def _initialize_email_service(self):
+    def _initialize_email_service(self, smtp_pool=None):
         """Initialize the existing email service"""
         try:
             # Import your existing email service
             from .email.email_service import RealEmailService
+            from .email.smtp_pool import shared_pool
             
             # Load credentials using your existing method
             gmail_email, gmail_password = self._load_credentials()
@@ -35,7 +36,8 @@ class EmailAction(BaseAction):
                 self.email_service = RealEmailService(
                     gmail_email=gmail_email,
                     gmail_password=gmail_password,
-                    use_real_email=self.config.get('use_real_email', True)
+                    use_real_email=self.config.get('use_real_email', True),
+                    pool=smtp_pool or shared_pool(gmail_email, gmail_password)
                 )
                 logger.info(f"✅ Email service initialized with {gmail_email}")
             else:
@@ -93,8 +95,11 @@ class EmailAction(BaseAction):
         logger.info(f"📧 Executing email action for customer {customer_context.get('customer_id', 'unknown')}")
         
         try:
-            # Use your existing email service
-            result = self.email_service.send_team_assignment(ai_response, customer_context)
+            # Use your existing email service; SMTP blocks, so run it off the
+            # event loop to let concurrent actions share the connection pool
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, self.email_service.send_team_assignment, ai_response, customer_context
+            )
             
             # Add action metadata
             result['action'] = 'email'
@@ -0,0 +1,29 @@
+import numpy as np
+from sklearn.base import BaseEstimator
+from sklearn.feature_selection import SelectorMixin
+
+class DocFreqSelector(SelectorMixin, BaseEstimator):
+    """Keep hashed term columns the way TfidfVectorizer prunes its vocabulary:
+    drop terms seen in fewer than min_df documents, then keep the
+    max_features most frequent across the corpus"""
+
+    def __init__(self, min_df=2, max_features=1000):
+        self.min_df = min_df
+        self.max_features = max_features
+
+    def fit(self, X, y=None):
+        X = X.tocsc()
+        doc_freq = np.diff(X.indptr)
+        term_freq = np.asarray(X.sum(axis=0)).ravel()
+
+        keep = np.flatnonzero(doc_freq >= self.min_df)
+        if self.max_features is not None and len(keep) > self.max_features:
+            keep = keep[np.argsort(-term_freq[keep], kind='stable')[:self.max_features]]
+
+        self.support_ = np.zeros(X.shape[1], dtype=bool)
+        self.support_[keep] = True
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _get_support_mask(self):
+        return self.support_
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import make_pipeline
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
@@ -8,16 +9,59 @@ from sklearn.metrics import classification_report, accuracy_score
 import joblib
 import os
 import re
+import sys
+from pathlib import Path
+
+# Import the selector through the training package (PYTHONPATH=src in the
+# containers) so pickled pipelines reference a module serving can import
+SRC_DIR = str(Path(__file__).resolve().parent.parent)
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+from training.feature_selection import DocFreqSelector
+
+def union_patterns(patterns):
+    """Compile a category's regexes into one alternation; they match disjoint
+    tokens, so the union's match count equals the sum of per-pattern counts"""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
 
 class EnhancedModelTrainer:
+    # Negative sentiment indicators
+    NEGATIVE_RE = union_patterns([
+        r'\b(bad|terrible|awful|horrible|worst|hate|angry|frustrated|disappointed)\b',
+        r'\b(can\'t|cannot|won\'t|don\'t|never|no|not)\b',
+        r'\b(lost|missing|broken|damaged|wrong|error|fail|problem)\b',
+        r'[!]{2,}',  # Multiple exclamation marks
+        r'[?]{2,}'   # Multiple question marks
+    ])
+    
+    # Positive sentiment indicators
+    POSITIVE_RE = union_patterns([
+        r'\b(great|excellent|amazing|wonderful|fantastic|perfect|love|thank|good)\b',
+        r'\b(yes|absolutely|definitely|sure|of course)\b'
+    ])
+    
+    # Urgency indicators
+    URGENCY_RE = union_patterns([
+        r'\b(urgent|emergency|immediately|asap|now|quick|fast)\b',
+        r'[!]{1,}'
+    ])
+    
     def __init__(self):
-        # Better feature extraction with more sophisticated patterns
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),  # Include bigrams
-            stop_words='english',
-            lowercase=True,
-            min_df=2  # Ignore rare words
+        # Hashed TF-IDF: no vocabulary dict to look tokens up in at serving time.
+        # The selector restores min_df/max_features pruning so the forests see
+        # ~1000 informative columns instead of 2**18 mostly empty ones
+        self.tfidf_vectorizer = make_pipeline(
+            HashingVectorizer(
+                n_features=2**18,
+                ngram_range=(1, 2),  # Include bigrams
+                stop_words='english',
+                lowercase=True,
+                alternate_sign=False,
+                norm=None,
+                dtype=np.float32
+            ),
+            DocFreqSelector(min_df=2, max_features=1000),  # Ignore rare terms
+            TfidfTransformer()
         )
         
         # Use Random Forest for better accuracy
@@ -45,38 +89,10 @@ class EnhancedModelTrainer:
         df['message_length'] = df['message'].str.len()
         df['word_count'] = df['message'].str.split().str.len()
         
-        # Add negative sentiment indicators
-        negative_patterns = [
-            r'\b(bad|terrible|awful|horrible|worst|hate|angry|frustrated|disappointed)\b',
-            r'\b(can\'t|cannot|won\'t|don\'t|never|no|not)\b',
-            r'\b(lost|missing|broken|damaged|wrong|error|fail|problem)\b',
-            r'[!]{2,}',  # Multiple exclamation marks
-            r'[?]{2,}'   # Multiple question marks
-        ]
-        
-        df['negative_indicators'] = 0
-        for pattern in negative_patterns:
-            df['negative_indicators'] += df['message'].str.count(pattern, flags=re.IGNORECASE)
-        
-        # Add positive sentiment indicators
-        positive_patterns = [
-            r'\b(great|excellent|amazing|wonderful|fantastic|perfect|love|thank|good)\b',
-            r'\b(yes|absolutely|definitely|sure|of course)\b'
-        ]
-        
-        df['positive_indicators'] = 0
-        for pattern in positive_patterns:
-            df['positive_indicators'] += df['message'].str.count(pattern, flags=re.IGNORECASE)
-        
-        # Add urgency indicators
-        urgency_patterns = [
-            r'\b(urgent|emergency|immediately|asap|now|quick|fast)\b',
-            r'[!]{1,}'
-        ]
-        
-        df['urgency_indicators'] = 0
-        for pattern in urgency_patterns:
-            df['urgency_indicators'] += df['message'].str.count(pattern, flags=re.IGNORECASE)
+        # Add sentiment and urgency indicators, one scan per category
+        df['negative_indicators'] = df['message'].str.count(self.NEGATIVE_RE)
+        df['positive_indicators'] = df['message'].str.count(self.POSITIVE_RE)
+        df['urgency_indicators'] = df['message'].str.count(self.URGENCY_RE)
             
         return df
     
@@ -98,9 +114,9 @@ class EnhancedModelTrainer:
                        'positive_indicators', 'urgency_indicators']
         X_features = df[feature_cols].values
         
-        # Combine all features
+        # Combine all features straight into CSR, the layout the forests use
         from scipy.sparse import hstack
-        X_combined = hstack([X_text, X_features])
+        X_combined = hstack([X_text, X_features], format='csr', dtype=np.float32)
         
         # Train issue classifier
         print("🎯 Training issue classifier...")
@@ -142,10 +158,11 @@ class EnhancedModelTrainer:
         
         # Save models
         os.makedirs('models', exist_ok=True)
-        joblib.dump(self.tfidf_vectorizer, 'models/tfidf_vectorizer.pkl')
-        joblib.dump(self.issue_classifier, 'models/issue_classifier.pkl')
-        joblib.dump(self.sentiment_classifier, 'models/sentiment_classifier.pkl')
-        joblib.dump(self.satisfaction_regressor, 'models/satisfaction_regressor.pkl')
+        # Keep artifacts uncompressed so serving can memory-map them
+        joblib.dump(self.tfidf_vectorizer, 'models/tfidf_vectorizer.pkl', compress=0)
+        joblib.dump(self.issue_classifier, 'models/issue_classifier.pkl', compress=0)
+        joblib.dump(self.sentiment_classifier, 'models/sentiment_classifier.pkl', compress=0)
+        joblib.dump(self.satisfaction_regressor, 'models/satisfaction_regressor.pkl', compress=0)
         
         print("✅ Enhanced models trained and saved!")
         